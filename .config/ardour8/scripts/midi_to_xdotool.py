@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
-import subprocess
+import argparse
+import atexit
+import ctypes
+import ctypes.util
+import heapq
+import itertools
+import math
+import os
+import shutil
 import mido
 import sys
 import threading
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from evdev import UInput, UInputError, ecodes
+except ImportError:  # python-evdev is optional; held repeats then go through X
+    UInput = None
 
 # Configuration
 ARROW_KEY_REPEAT_COUNT = 1
@@ -16,7 +30,13 @@ MOUSE_SCROLL_UP_BUTTON = '4'
 MOUSE_SCROLL_DOWN_BUTTON = '5'
 REPEAT_DELAY = 0.3  # Initial delay before key repeat starts (seconds)
 REPEAT_INTERVAL = 0.01  # Time between repeated keypresses (seconds)
+REPEAT_TICK = 0.05  # How often held repeats are flushed as one batched event (seconds)
+NOTE_BOUNCE_WINDOW = 0.005  # A re-press this soon after release is pad bounce, not a new hit (seconds)
+MOUSE_FLUSH_INTERVAL = 0.016  # Touchpad movement is coalesced and sent at most once per frame (seconds)
 ARDOUR_WINDOW_NAME = 'Ardour'  # Match text that appears in the main window title
+XDO_KEY_DELAY = 0  # Microseconds between keystrokes (xdotool defaults to 12ms)
+LIBXDO_NAME = 'libxdo.so.3'
+UINPUT_REPEATS = True  # Send held repeats through /dev/uinput (to the focused window) when possible
 MIDI_CHANNEL = 9
 
 # NOTE_* values refer to padKONTROL pad note numbers (control-surface IDs)
@@ -33,6 +53,9 @@ TOUCHPAD_CONTROLLER = 1  # CC controlling vertical movement
 TOUCHPAD_X_SENSITIVITY = 0.05  # Pixels per pitch-bend delta unit
 TOUCHPAD_Y_SENSITIVITY = 4  # Pixels per CC delta unit
 DEBUG_NOTES = False  # Set True to print note_on/off diagnostics
+PORT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'midi_to_xdotool', 'port'
+)  # Last resolved padKONTROL port name, tried before scanning
 
 @dataclass(frozen=True)
 class Action:
@@ -72,118 +95,433 @@ NOTE_ACTIONS: Dict[int, Action] = {
     NOTE_SPACE: Action(kind='key', value='space'),
 }
 
-# Auto-find padKONTROL CTRL port
-port_name = None
-for port in mido.get_input_names():
-    if 'padKONTROL' in port and 'CTRL' in port:
-        port_name = port
-        break
-
-if not port_name:
-    print("Error: padKONTROL CTRL port not found!", file=sys.stderr)
-    sys.exit(1)
-
-print(f"Listening on {port_name}", file=sys.stderr)
+# Flat lookup indexed by note number; MIDI notes are always 0-127
+ACTION_BY_NOTE: List[Optional[Action]] = [None] * 128
+for _note, _action in NOTE_ACTIONS.items():
+    ACTION_BY_NOTE[_note] = _action
+
+# evdev equivalents of the xdotool key names and wheel buttons used by NOTE_ACTIONS
+UINPUT_KEYS = {
+    'minus': 'KEY_MINUS',
+    'Escape': 'KEY_ESC',
+    'Left': 'KEY_LEFT',
+    'Right': 'KEY_RIGHT',
+    'Home': 'KEY_HOME',
+    'space': 'KEY_SPACE',
+}
+UINPUT_WHEEL_STEPS = {
+    MOUSE_SCROLL_UP_BUTTON: 1,
+    MOUSE_SCROLL_DOWN_BUTTON: -1,
+}
 
-# Track held notes that should trigger repeats; value is the stop event for that note
+parser = argparse.ArgumentParser(description='Translate padKONTROL pad and touchpad input into Ardour key and mouse events.')
+parser.add_argument(
+    '--profile',
+    choices=('minimal', 'full'),
+    default='full',
+    help='minimal sends one event per pad press; full adds held-pad repeats and the touchpad (default: full)',
+)
+args = parser.parse_args()
+FULL_PROFILE = args.profile == 'full'
+
+# Track held notes that should trigger repeats; a repeater runs while its handle is still registered
 @dataclass
 class RepeaterHandle:
-    stop_event: threading.Event
-    thread: threading.Thread
+    note: int
+    action: Action
+    last_tick: float  # time up to which repeat cycles have been sent
+    generation: int = 0  # bumped when a bounced note resumes, retiring any older tick chain
 
 
 held_repeaters: Dict[int, RepeaterHandle] = {}
-repeat_lock = threading.Lock()
-ardour_window: Optional[str] = None
+# Last released handle and release time per note, so pad bounce can resume the repeater
+released_repeaters: Dict[int, RepeaterHandle] = {}
+last_off_time: Dict[int, float] = {}
+# Min-heap of (due time, tiebreak, task) run by the single scheduler thread; tasks receive their due time
+scheduled_tasks: List[Tuple[float, int, Callable[[float], None]]] = []
+scheduler_cv = threading.Condition()
+scheduler_seq = itertools.count()
+ardour_window: Optional[int] = None
+ardour_pid: Optional[int] = None  # owner of ardour_window, used to validate the cached ID
+window_lock = threading.Lock()  # the MIDI callback and the scheduler both look up the window
 last_touchpad_cc: Optional[int] = None
 last_touchpad_pitch: Optional[int] = None
+# Touchpad movement accumulated between frame flushes and sent as one relative move
+pending_dx = 0
+pending_dy = 0
+mouse_lock = threading.Lock()
+mouse_flush_scheduled = False
 active_notes: Dict[int, float] = {}
+# Fallback-path xdotool script lines, rendered for the window ID at flush time
+queued_commands: List[Callable[[int], str]] = []
+# Fallback-path relative mouse moves; these don't target the Ardour window
+queued_moves: List[str] = []
+queue_lock = threading.Lock()
 
 def debug(msg: str) -> None:
     if DEBUG_NOTES:
         print(msg, file=sys.stderr)
 
-def get_ardour_window(force_refresh: bool = False) -> Optional[str]:
-    """Find and cache the Ardour main window ID."""
-    global ardour_window
+def find_port_name() -> Optional[str]:
+    """Auto-find the padKONTROL CTRL port."""
+    for port in mido.get_input_names():
+        if 'padKONTROL' in port and 'CTRL' in port:
+            return port
+    return None
 
-    if force_refresh:
-        ardour_window = None
+def read_cached_port() -> Optional[str]:
+    try:
+        with open(PORT_CACHE_PATH) as cache:
+            return cache.read().strip() or None
+    except OSError:
+        return None
 
-    if ardour_window:
-        return ardour_window
+def write_cached_port(port_name: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(PORT_CACHE_PATH), exist_ok=True)
+        with open(PORT_CACHE_PATH, 'w') as cache:
+            cache.write(port_name + '\n')
+    except OSError as exc:
+        print(f"Warning: could not cache port name in {PORT_CACHE_PATH} ({exc})", file=sys.stderr)
+
+def open_padkontrol(callback):
+    """Open the padKONTROL input, trying the cached port name before scanning."""
+    port_name = read_cached_port()
+    if port_name:
+        try:
+            return port_name, mido.open_input(port_name, callback=callback)
+        except OSError:
+            debug(f"[port] cached port {port_name!r} unavailable; scanning")
+
+    port_name = find_port_name()
+    if not port_name:
+        print("Error: padKONTROL CTRL port not found!", file=sys.stderr)
+        sys.exit(1)
+    inport = mido.open_input(port_name, callback=callback)
+    write_cached_port(port_name)
+    return port_name, inport
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int),
+        ('display', ctypes.c_void_p),
+        ('resourceid', ctypes.c_ulong),
+        ('serial', ctypes.c_ulong),
+        ('error_code', ctypes.c_ubyte),
+        ('request_code', ctypes.c_ubyte),
+        ('minor_code', ctypes.c_ubyte),
+    ]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+x_errors: List[int] = []  # X error codes reported since the last _x_sync_ok() check
+
+@XErrorHandler
+def _record_x_error(display, event) -> int:
+    """Record X errors instead of letting Xlib's default handler exit the process."""
+    x_errors.append(event.contents.error_code)
+    debug(f"[x11] error {event.contents.error_code} for resource {event.contents.resourceid:#x}")
+    return 0
+
+def load_libx11():
+    """Open libX11 and install the recording error handler used by the libxdo path."""
+    try:
+        lib = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+    except OSError:
+        return None
+
+    lib.XSetErrorHandler.argtypes = [XErrorHandler]
+    lib.XSetErrorHandler.restype = ctypes.c_void_p
+    lib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XSync.restype = ctypes.c_int
+    lib.XSetErrorHandler(_record_x_error)
+    return lib
+
+def load_libxdo():
+    """Open libxdo and a single X connection for the lifetime of the process."""
+    try:
+        lib = ctypes.CDLL(LIBXDO_NAME)
+    except OSError:
+        return None, None
+
+    lib.xdo_new.argtypes = [ctypes.c_char_p]
+    lib.xdo_new.restype = ctypes.c_void_p
+    lib.xdo_send_keysequence_window.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_char_p, ctypes.c_uint]
+    lib.xdo_send_keysequence_window.restype = ctypes.c_int
+    lib.xdo_click_window.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int]
+    lib.xdo_click_window.restype = ctypes.c_int
+    lib.xdo_move_mouse_relative.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+    lib.xdo_move_mouse_relative.restype = ctypes.c_int
+    lib.xdo_get_pid_window.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    lib.xdo_get_pid_window.restype = ctypes.c_int
+    # Modifier save/clear/restore backs the --clearmodifiers behaviour of `xdotool key`
+    modifier_args = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int]
+    lib.xdo_get_active_modifiers.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_int)]
+    lib.xdo_get_active_modifiers.restype = ctypes.c_int
+    lib.xdo_clear_active_modifiers.argtypes = modifier_args
+    lib.xdo_clear_active_modifiers.restype = ctypes.c_int
+    lib.xdo_set_active_modifiers.argtypes = modifier_args
+    lib.xdo_set_active_modifiers.restype = ctypes.c_int
+
+    handle = lib.xdo_new(None)
+    if not handle:
+        return None, None
+    return lib, ctypes.c_void_p(handle)
+
+# Shared sink for xdotool output, opened once rather than per spawn
+_DEVNULL = open(os.devnull, 'wb')
+atexit.register(_DEVNULL.close)
+
+# Resolved once so each spawn can use posix_spawn directly instead of searching PATH
+XDOTOOL_PATH = shutil.which('xdotool')
+if not XDOTOOL_PATH:
+    print("Error: xdotool not found in PATH!", file=sys.stderr)
+    sys.exit(1)
 
+def run_xdotool(args: List[str], stdin_data: bytes = b'', capture: bool = False) -> Tuple[int, bytes]:
+    """Run xdotool via posix_spawn; returns its exit code and stdout (empty unless capture is set)."""
+    file_actions = [(os.POSIX_SPAWN_DUP2, _DEVNULL.fileno(), 2)]
+    stdin_read = stdin_write = stdout_read = stdout_write = None
+    pipe_fds: List[int] = []
+    try:
+        if stdin_data:
+            stdin_read, stdin_write = os.pipe()
+            pipe_fds += [stdin_read, stdin_write]
+            file_actions.append((os.POSIX_SPAWN_DUP2, stdin_read, 0))
+        if capture:
+            stdout_read, stdout_write = os.pipe()
+            pipe_fds += [stdout_read, stdout_write]
+            file_actions.append((os.POSIX_SPAWN_DUP2, stdout_write, 1))
+        else:
+            file_actions.append((os.POSIX_SPAWN_DUP2, _DEVNULL.fileno(), 1))
+        pid = os.posix_spawn(XDOTOOL_PATH, ['xdotool', *args], os.environ, file_actions=file_actions)
+    except OSError as exc:
+        # Report failure like a non-zero exit so callers' error paths handle it instead of the thread dying
+        for fd in pipe_fds:
+            os.close(fd)
+        print(f"Error: could not run xdotool ({exc})", file=sys.stderr)
+        return 127, b''
+
+    # Pipe ends are close-on-exec, so the child only keeps the descriptors dup'd onto 0-2
+    for fd in (stdin_read, stdout_write):
+        if fd is not None:
+            os.close(fd)
+
+    output = b''
+    if stdin_write is not None:
+        try:
+            os.write(stdin_write, stdin_data)
+        except BrokenPipeError:
+            pass
+        finally:
+            os.close(stdin_write)
+    if stdout_read is not None:
+        with open(stdout_read, 'rb') as stdout:
+            output = stdout.read()
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status), output
+
+libc = ctypes.CDLL(ctypes.util.find_library('c'))
+libc.free.argtypes = [ctypes.c_void_p]
+# libxdo is only used with the error handler in place; otherwise a vanished window makes Xlib exit()
+libx11 = load_libx11()
+libxdo, xdo = load_libxdo() if libx11 else (None, None)
+# xdo_t starts with its Display*, which XSync needs to surface errors from XSendEvent-based delivery
+xdisplay = ctypes.c_void_p.from_address(xdo.value) if libxdo else None
+# Xlib is not thread-safe without XInitThreads; serialise every call on the shared xdo handle
+xdo_lock = threading.Lock()
+if not libxdo:
+    print(f"Warning: {LIBXDO_NAME} or libX11 unavailable; falling back to the xdotool command", file=sys.stderr)
+
+def _x_sync_ok() -> bool:
+    """Flush queued X requests and report whether any failed since the last check; call under xdo_lock."""
+    libx11.XSync(xdisplay, 0)
+    ok = not x_errors
+    x_errors.clear()
+    return ok
+
+def open_uinput():
+    """Create the virtual input device used for held repeats, if enabled and permitted."""
+    if not FULL_PROFILE or not UINPUT_REPEATS or UInput is None:
+        return None
+    capabilities = {
+        ecodes.EV_KEY: [ecodes.ecodes[name] for name in UINPUT_KEYS.values()] + [ecodes.BTN_LEFT],
+        ecodes.EV_REL: [ecodes.REL_X, ecodes.REL_Y, ecodes.REL_WHEEL],
+    }
+    try:
+        return UInput(capabilities, name='midi_to_xdotool')
+    except (OSError, UInputError) as exc:
+        print(f"Warning: uinput unavailable ({exc}); held repeats will use X", file=sys.stderr)
+        return None
+
+uinput = open_uinput()
+
+def _window_pid(window: int) -> Optional[int]:
+    """Return the PID owning the window, or None if it does not advertise one."""
+    if libxdo:
+        with xdo_lock:
+            pid = libxdo.xdo_get_pid_window(xdo, ctypes.c_ulong(window))
+            # A window destroyed since the search raises BadWindow here; don't trust a PID read from it
+            if not _x_sync_ok():
+                return None
+        return pid or None
+    status, output = run_xdotool(['getwindowpid', str(window)], capture=True)
     try:
-        output = subprocess.check_output(
-            ['xdotool', 'search', '--onlyvisible', '--name', ARDOUR_WINDOW_NAME],
-            stderr=subprocess.DEVNULL,
-        )
-        ardour_window = output.splitlines()[0].decode().strip()
-    except (subprocess.CalledProcessError, IndexError):
-        ardour_window = None
-    return ardour_window
-
-def _run_with_window(cmd_builder):
-    """Run an xdotool command tied to the Ardour window, retrying once if needed."""
+        return int(output) if status == 0 else None
+    except ValueError:
+        return None
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def get_ardour_window(force_refresh: bool = False, failed_window: Optional[int] = None) -> Optional[int]:
+    """Find and cache the Ardour main window ID, re-searching only if Ardour has exited.
+
+    A live PID doesn't prove the window still exists (e.g. a closed dialog matched the search), so
+    deliveries report X errors and _run_with_window forces a refresh; a forced refresh for
+    failed_window is skipped if another thread has already replaced it.
+    """
+    global ardour_window, ardour_pid
+
+    with window_lock:
+        if force_refresh and failed_window is not None and ardour_window and ardour_window != failed_window:
+            return ardour_window
+
+        if ardour_window and ardour_pid and not _process_alive(ardour_pid):
+            force_refresh = True
+
+        if ardour_window and not force_refresh:
+            return ardour_window
+
+        previous_window = ardour_window
+        ardour_pid = None
+        status, output = run_xdotool(['search', '--onlyvisible', '--name', ARDOUR_WINDOW_NAME], capture=True)
+        try:
+            ardour_window = int(output.splitlines()[0]) if status == 0 else None
+        except (IndexError, ValueError):
+            ardour_window = None
+        if ardour_window:
+            ardour_pid = _window_pid(ardour_window)
+        if ardour_window != previous_window:
+            _key_cmd.cache_clear()
+            _click_cmd.cache_clear()
+        return ardour_window
+
+@lru_cache(maxsize=128)
+def _key_cmd(window: int, key: str, count: int) -> str:
+    keys = ' '.join([key] * count)
+    return f'key --window {window} --clearmodifiers --delay {XDO_KEY_DELAY // 1000} {keys}'
+
+@lru_cache(maxsize=128)
+def _click_cmd(window: int, button: str, count: int) -> str:
+    return f'click --window {window} --delay {XDO_KEY_DELAY // 1000} --repeat {count} {button}'
+
+def _run_script(lines: List[str]) -> bool:
+    """Run several xdotool commands in one process by feeding them to `xdotool -`."""
+    status, _ = run_xdotool(['-'], stdin_data='\n'.join(lines).encode() + b'\n')
+    return status == 0
+
+def _run_with_window(deliver):
+    """Deliver events to the Ardour window, retrying once if a fresh search finds a different window."""
     window = get_ardour_window()
     if not window:
         print("Error: Ardour window not found; cannot send events.", file=sys.stderr)
         return False
 
     for refresh in (False, True):
-        cmd = cmd_builder(window)
-        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        if result.returncode == 0:
+        if deliver(window):
             return True
 
         if refresh:
             break
-        window = get_ardour_window(force_refresh=True)
-        if not window:
+        refreshed = get_ardour_window(force_refresh=True, failed_window=window)
+        # Retrying against the same window would replay anything already delivered before the failure
+        if not refreshed or refreshed == window:
             break
+        window = refreshed
 
     print("Error: Failed to deliver events to Ardour window.", file=sys.stderr)
     return False
 
+def _xdo_send_key(window: int, key: bytes, count: int) -> bool:
+    win = ctypes.c_ulong(window)
+    modifiers = ctypes.c_void_p()
+    modifier_count = ctypes.c_int(0)
+    with xdo_lock:
+        libxdo.xdo_get_active_modifiers(xdo, ctypes.byref(modifiers), ctypes.byref(modifier_count))
+        libxdo.xdo_clear_active_modifiers(xdo, win, modifiers, modifier_count)
+        sent = True
+        try:
+            for _ in range(count):
+                if libxdo.xdo_send_keysequence_window(xdo, win, key, XDO_KEY_DELAY) != 0:
+                    sent = False
+                    break
+        finally:
+            libxdo.xdo_set_active_modifiers(xdo, win, modifiers, modifier_count)
+            libc.free(modifiers)
+        # XSendEvent reports success even for a destroyed window; the BadWindow only shows up on sync
+        return _x_sync_ok() and sent
+
+def _xdo_click(window: int, button: int, count: int) -> bool:
+    win = ctypes.c_ulong(window)
+    with xdo_lock:
+        sent = True
+        for _ in range(count):
+            if libxdo.xdo_click_window(xdo, win, button) != 0:
+                sent = False
+                break
+        return _x_sync_ok() and sent
+
 def send_key(key: str, count: int = 1) -> None:
     """Send key events directly to the Ardour window."""
-    _run_with_window(
-        lambda window: [
-            'xdotool',
-            'key',
-            '--window',
-            window,
-            '--clearmodifiers',
-            '--repeat',
-            str(count),
-            key,
-        ]
-    )
+    if libxdo:
+        keysequence = key.encode()
+        _run_with_window(lambda window: _xdo_send_key(window, keysequence, count))
+        return
+    queue_command(lambda window: _key_cmd(window, key, count))
 
 def click_mouse(button: str, count: int = 1) -> None:
     """Trigger mouse clicks (used for wheel emulation)."""
-    _run_with_window(
-        lambda window: [
-            'xdotool',
-            'click',
-            '--window',
-            window,
-            '--repeat',
-            str(count),
-            button,
-        ]
-    )
+    if libxdo:
+        _run_with_window(lambda window: _xdo_click(window, int(button), count))
+        return
+    queue_command(lambda window: _click_cmd(window, button, count))
 
 def move_mouse(dx: int = 0, dy: int = 0) -> None:
     """Move mouse relative to current pointer position."""
     if dx == 0 and dy == 0:
         return
-    subprocess.run(
-        ['xdotool', 'mousemove_relative', '--', str(dx), str(dy)],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+    if libxdo:
+        with xdo_lock:
+            libxdo.xdo_move_mouse_relative(xdo, dx, dy)
+            # Sync so a failure here isn't blamed on the next key or click delivery
+            _x_sync_ok()
+        return
+    with queue_lock:
+        queued_moves.append(f'mousemove_relative -- {dx} {dy}')
+
+def queue_command(render: Callable[[int], str]) -> None:
+    with queue_lock:
+        queued_commands.append(render)
+
+def flush_events() -> None:
+    """Deliver commands queued by the xdotool fallback, one process for moves and one for window events."""
+    with queue_lock:
+        moves = queued_moves[:]
+        queued_moves.clear()
+        renders = queued_commands[:]
+        queued_commands.clear()
+    # Mouse moves work without the Ardour window, so they skip the window lookup and its retry
+    if moves:
+        _run_script(moves)
+    if renders:
+        _run_with_window(lambda window: _run_script([render(window) for render in renders]))
 
 def send_action(action: Action, count: Optional[int] = None) -> None:
     """Dispatch the configured action."""
@@ -195,35 +533,145 @@ def send_action(action: Action, count: Optional[int] = None) -> None:
     else:
         print(f"Warning: Unsupported action kind '{action.kind}' for value '{action.value}'", file=sys.stderr)
 
-def start_repeat(note: int, action: Action) -> None:
-    """Spawn a repeating sender for the provided note/action."""
-    if not action.hold_repeat_count:
+def send_uinput(action: Action, count: int) -> bool:
+    """Write the action straight to the uinput device; False if it has no evdev mapping."""
+    if action.kind == 'key':
+        name = UINPUT_KEYS.get(action.value)
+        if name is None:
+            return False
+        code = ecodes.ecodes[name]
+        for _ in range(count):
+            uinput.write(ecodes.EV_KEY, code, 1)
+            uinput.syn()
+            uinput.write(ecodes.EV_KEY, code, 0)
+            uinput.syn()
+        return True
+    if action.kind == 'mouse':
+        step = UINPUT_WHEEL_STEPS.get(action.value)
+        if step is None:
+            return False
+        uinput.write(ecodes.EV_REL, ecodes.REL_WHEEL, step * count)
+        uinput.syn()
+        return True
+    return False
+
+def send_repeat(action: Action, count: int) -> None:
+    """Send a held-note repeat, bypassing X via uinput when available."""
+    if uinput and send_uinput(action, count):
+        return
+    send_action(action, count)
+
+def schedule(due: float, task: Callable[[float], None]) -> None:
+    """Queue a task and wake the scheduler in case it is now the earliest."""
+    with scheduler_cv:
+        heapq.heappush(scheduled_tasks, (due, next(scheduler_seq), task))
+        scheduler_cv.notify()
+
+def scheduler_worker() -> None:
+    """Run scheduled tasks as they fall due; one thread serves every held note and the touchpad."""
+    # Hoisted to locals: this loop runs for every repeat tick and touchpad frame
+    monotonic = time.monotonic
+    heappop = heapq.heappop
+    wait = scheduler_cv.wait
+    tasks = scheduled_tasks
+    while True:
+        with scheduler_cv:
+            while True:
+                now = monotonic()
+                if tasks and tasks[0][0] <= now:
+                    break
+                wait(tasks[0][0] - now if tasks else None)
+            due_tasks = []
+            while tasks and tasks[0][0] <= now:
+                due, _, task = heappop(tasks)
+                due_tasks.append((due, task))
+        # This is the only scheduler thread: a failing task must not end repeats and touchpad for the session
+        for due, task in due_tasks:
+            try:
+                task(due)
+            except Exception as exc:
+                print(f"Error: scheduled task failed: {exc!r}", file=sys.stderr)
+        # Everything that fell due together reaches the xdotool fallback as one process
+        try:
+            flush_events()
+        except Exception as exc:
+            print(f"Error: failed to flush queued events: {exc!r}", file=sys.stderr)
+
+def next_repeat_tick(after: float) -> float:
+    """Return the first point on the shared repeat grid strictly after the given time."""
+    ticks = after / REPEAT_TICK
+    # A grid point divided back by REPEAT_TICK can land just below its own index; snap it so the
+    # point itself isn't returned again
+    index = round(ticks) if abs(ticks - round(ticks)) < 1e-6 else math.floor(ticks)
+    return (index + 1) * REPEAT_TICK
+
+def repeat_tick(handle: RepeaterHandle, generation: int, due: float) -> None:
+    """Send the repeat cycles a held note has accrued and queue its next tick."""
+    # Dict lookups are atomic under the GIL; a pop or replacement by the MIDI callback retires this handle
+    if held_repeaters.get(handle.note) is not handle or handle.generation != generation:
         return
+    now = time.monotonic()
+    cycles = int((now - handle.last_tick) / REPEAT_INTERVAL)
+    if cycles:
+        send_repeat(handle.action, cycles * handle.action.hold_repeat_count)
+        handle.last_tick += cycles * REPEAT_INTERVAL
+    # Every held note ticks on one shared absolute grid, so ticks don't drift and simultaneously held pads
+    # fall due together; a late tick (now past due) already sent its backlog above, so passed points are skipped
+    schedule(next_repeat_tick(max(due, now)), partial(repeat_tick, handle, generation))
 
-    with repeat_lock:
-        existing = held_repeaters.get(note)
-        if existing and existing.thread.is_alive():
-            return
+def start_repeat(note: int, action: Action) -> None:
+    """Register a held note so the repeat worker starts sending its action."""
+    if not FULL_PROFILE or not action.hold_repeat_count:
+        return
 
-        stop_event = threading.Event()
+    if note in held_repeaters:
+        return
 
-        def repeater():
-            time.sleep(REPEAT_DELAY)
-            while not stop_event.is_set():
-                send_action(action, action.hold_repeat_count)
-                time.sleep(REPEAT_INTERVAL)
+    first_tick = time.monotonic() + REPEAT_DELAY
+    # Backdate by one interval so the first tick fires a single cycle immediately
+    handle = RepeaterHandle(note=note, action=action, last_tick=first_tick - REPEAT_INTERVAL)
+    held_repeaters[note] = handle
+    schedule(first_tick, partial(repeat_tick, handle, handle.generation))
 
-        thread = threading.Thread(target=repeater, daemon=True)
-        held_repeaters[note] = RepeaterHandle(stop_event=stop_event, thread=thread)
-        thread.start()
+def resume_repeat(note: int) -> None:
+    """Re-register the repeater released by a bounce, as if the note had stayed held."""
+    handle = released_repeaters.pop(note, None)
+    if handle is None or note in held_repeaters:
+        return
+    handle.generation += 1
+    held_repeaters[note] = handle
+    # Still inside the initial delay the first tick stays put; otherwise rejoin the shared grid
+    schedule(
+        max(handle.last_tick + REPEAT_INTERVAL, next_repeat_tick(time.monotonic())),
+        partial(repeat_tick, handle, handle.generation),
+    )
 
 def stop_repeat(note: int) -> None:
-    with repeat_lock:
-        handle = held_repeaters.pop(note, None)
-    if handle:
-        handle.stop_event.set()
-    else:
+    handle = held_repeaters.pop(note, None)
+    if handle is None:
         debug(f"[repeat] stop requested for note {note} but no repeater active")
+        return
+    released_repeaters[note] = handle
+
+def flush_mouse(due: float) -> None:
+    """Send the touchpad movement accumulated since the last flush."""
+    global pending_dx, pending_dy, mouse_flush_scheduled
+    # Clear the flag before taking the deltas so movement arriving mid-flush schedules another frame
+    mouse_flush_scheduled = False
+    with mouse_lock:
+        dx, dy = pending_dx, pending_dy
+        pending_dx = pending_dy = 0
+    move_mouse(dx, dy)
+
+def queue_mouse(dx: int = 0, dy: int = 0) -> None:
+    """Accumulate touchpad movement and make sure a frame flush is pending."""
+    global pending_dx, pending_dy, mouse_flush_scheduled
+    with mouse_lock:
+        pending_dx += dx
+        pending_dy += dy
+    if not mouse_flush_scheduled:
+        mouse_flush_scheduled = True
+        schedule(time.monotonic() + MOUSE_FLUSH_INTERVAL, flush_mouse)
 
 def handle_touchpad_vertical(value: int) -> None:
     global last_touchpad_cc
@@ -234,7 +682,7 @@ def handle_touchpad_vertical(value: int) -> None:
     last_touchpad_cc = value
     if delta == 0:
         return
-    move_mouse(dy=int(delta * TOUCHPAD_Y_SENSITIVITY))
+    queue_mouse(dy=int(delta * TOUCHPAD_Y_SENSITIVITY))
 
 def handle_touchpad_horizontal(pitch_value: int) -> None:
     global last_touchpad_pitch
@@ -245,19 +693,28 @@ def handle_touchpad_horizontal(pitch_value: int) -> None:
     last_touchpad_pitch = pitch_value
     if delta == 0:
         return
-    move_mouse(dx=int(delta * TOUCHPAD_X_SENSITIVITY))
+    queue_mouse(dx=int(delta * TOUCHPAD_X_SENSITIVITY))
 
 def handle_note_on(note: int) -> None:
-    active_notes[note] = time.monotonic()
+    now = time.monotonic()
+    active_notes[note] = now
     debug(f"[note] on  {note}")
-    action = NOTE_ACTIONS.get(note)
+    action = ACTION_BY_NOTE[note]
     if not action:
         print(f"Info: Unmapped note_on received for note {note}", file=sys.stderr)
         return
+    if now - last_off_time.get(note, float('-inf')) < NOTE_BOUNCE_WINDOW:
+        debug(f"[note] bounce {note}; continuing the previous hold")
+        resume_repeat(note)
+        return
+    # Past the bounce window the released handle is stale; only a genuine bounce may resume it
+    released_repeaters.pop(note, None)
     send_action(action)
+    flush_events()
     start_repeat(note, action)
 
 def handle_note_off(note: int) -> None:
+    last_off_time[note] = time.monotonic()
     removed = active_notes.pop(note, None)
     if removed is None:
         debug(f"[note] off {note} (no matching active note)")
@@ -265,21 +722,55 @@ def handle_note_off(note: int) -> None:
         debug(f"[note] off {note}")
     stop_repeat(note)
 
-with mido.open_input(port_name) as inport:
-    for msg in inport:
-        if msg.channel != MIDI_CHANNEL:
-            continue
-
-        if msg.type == 'note_on':
-            if msg.velocity == 0:
-                handle_note_off(msg.note)
-            else:
-                handle_note_on(msg.note)
-        elif msg.type == 'note_off':
-            handle_note_off(msg.note)
-        elif msg.type == 'control_change' and msg.control == TOUCHPAD_CONTROLLER:
-            handle_touchpad_vertical(msg.value)
-        elif msg.type == 'pitchwheel':
-            handle_touchpad_horizontal(msg.pitch)
-        else:
-            print(f"Info: Unsupported MIDI message type '{msg.type}' on channel {msg.channel}", file=sys.stderr)
+def on_note_on(msg) -> None:
+    if msg.velocity == 0:
+        handle_note_off(msg.note)
+    else:
+        handle_note_on(msg.note)
+
+def on_note_off(msg) -> None:
+    handle_note_off(msg.note)
+
+def on_touchpad_cc(msg) -> None:
+    handle_touchpad_vertical(msg.value)
+
+def on_touchpad_pitch(msg) -> None:
+    handle_touchpad_horizontal(msg.pitch)
+
+def ignore_message(msg) -> None:
+    pass
+
+def on_unmapped(msg) -> None:
+    """Handle messages without a DISPATCH entry (unmapped notes, other controllers)."""
+    if msg.type == 'note_on':
+        on_note_on(msg)
+    elif msg.type == 'note_off':
+        on_note_off(msg)
+    else:
+        print(f"Info: Unsupported MIDI message type '{msg.type}' on channel {msg.channel}", file=sys.stderr)
+
+# Jump table keyed by (message type, note or controller number); pitchwheel carries neither
+DISPATCH = {
+    **{('note_on', note): on_note_on for note in NOTE_ACTIONS},
+    **{('note_off', note): on_note_off for note in NOTE_ACTIONS},
+    ('control_change', TOUCHPAD_CONTROLLER): on_touchpad_cc if FULL_PROFILE else ignore_message,
+    ('pitchwheel', None): on_touchpad_pitch if FULL_PROFILE else ignore_message,
+}
+
+def handle_message(msg, dispatch_get=DISPATCH.get, channel=MIDI_CHANNEL, unmapped=on_unmapped) -> None:
+    """mido input callback; runs on the MIDI backend's thread for every incoming message."""
+    # Lookups are bound as defaults so the per-message path only touches locals
+    if msg.channel != channel:
+        return
+
+    handler = dispatch_get((msg.type, getattr(msg, 'note', getattr(msg, 'control', None))), unmapped)
+    handler(msg)
+
+threading.Thread(target=scheduler_worker, daemon=True).start()
+
+port_name, inport = open_padkontrol(handle_message)
+print(f"Listening on {port_name}", file=sys.stderr)
+
+with inport:
+    # Messages are handled on the backend's callback thread; keep the main thread parked until killed
+    threading.Event().wait()